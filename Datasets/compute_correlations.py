@@ -21,13 +21,84 @@ PROC_DIR = Path(__file__).parent / "processed"
 OUT_DIR  = Path(__file__).parent / "correlations"
 OUT_DIR.mkdir(exist_ok=True)
 
+# Processed files each cross-dataset stage reads (used by watch.py to
+# re-run only the stages a changed file feeds into).
+STAGE_INPUTS = {
+    "daily":   ["BSE_SENSEX_processed.csv", "daily_market_data_processed.csv",
+                "crude_oil_price_processed.csv", "DGS10_processed.csv", "DHHNGSP_processed.csv"],
+    "monthly": ["monthly_macro_data_processed.csv", "crude_oil_price_processed.csv",
+                "DHHNGSP_processed.csv", "DGS10_processed.csv", "BSE_SENSEX_processed.csv"],
+    "annual":  ["india_macro_worldbank_processed.csv", "Henry_Hub_annual_processed.csv"],
+}
+
+_frame_cache = {}
+
+def read_processed(name, parse_dates=None):
+    """
+    Read a processed CSV.  Parsed frames are kept and reused for as long
+    as the file's mtime is unchanged, so a resident process only
+    re-parses what was rewritten.
+    """
+    fp = PROC_DIR / name
+    mtime = fp.stat().st_mtime_ns
+    key = (name, tuple(parse_dates or ()))
+    hit = _frame_cache.get(key)
+    if hit is None or hit[0] != mtime:
+        hit = _frame_cache[key] = (mtime, pd.read_csv(fp, parse_dates=parse_dates))
+    return hit[1].copy()
+
+def close_columns(merged):
+    """Close-price (level) columns of the merged daily frame – the rolling-correlation assets."""
+    cols = [c for c in merged.columns if c.endswith("_close") and not c.startswith("log")]
+    if not cols:
+        cols = [c for c in merged.columns if "close" in c.lower() or "price" in c.lower() or "DGS10" in c or "DHHNGSP" in c]
+        cols = [c for c in cols if not c.startswith("log")]
+    return cols
+
+def last_complete_date(merged, cols, max_lag=pd.Timedelta(days=31)):
+    """
+    Last date on which every column in *cols* has a real observation.
+    Merged frames are forward-filled to the newest date of any series, so a
+    lagging series ends in a run of copies of its last value; the first row
+    of that run is taken as its last observation (a genuinely repeated
+    value only holds one extra row back).  Series more than *max_lag*
+    behind the freshest one are treated as discontinued and ignored.
+    """
+    v = merged[cols].to_numpy()
+    moved = np.vstack([np.ones((1, v.shape[1]), dtype=bool), v[1:] != v[:-1]])
+    last = merged.index[len(v) - 1 - np.argmax(moved[::-1], axis=0)]
+    return last[last >= last.max() - max_lag].min()
+
+def log_returns(merged):
+    """
+    One log-return series per benchmark: first differences of the log-level
+    columns (log_*) of a merged frame, named without the "log_" prefix
+    (e.g. DHHNGSP, brent_close).  The precomputed return / change /
+    _shifted columns are skipped so no benchmark appears twice.
+    """
+    log_cols = [c for c in merged.columns
+                if c.startswith("log_") and "return" not in c and "shifted" not in c]
+    rets = merged[log_cols].diff().iloc[1:]
+    rets.columns = [c[len("log_"):] for c in log_cols]
+    return rets
+
+def save_merged_frame(merged, name):
+    """Write an index-carrying merged frame to OUT_DIR/name."""
+    merged.reset_index().to_csv(OUT_DIR / name, index=False)
+    print(f"  ✓ {name:38s} {len(merged):,} rows × {len(merged.columns)} cols")
+
 # ── 1.  Within-dataset correlation matrices ──────────────────────────────
 
-def within_dataset_correlations():
-    """Compute & save a Pearson correlation matrix for every processed CSV."""
+def within_dataset_correlations(names=None):
+    """
+    Compute & save a Pearson correlation matrix for every processed CSV
+    (or only for the file names in *names*).
+    """
     print("\n── Within-dataset correlation matrices ─────────────────────")
     for fp in sorted(PROC_DIR.glob("*.csv")):
-        df = pd.read_csv(fp)
+        if names is not None and fp.name not in names:
+            continue
+        df = read_processed(fp.name)
         num = df.select_dtypes(include="number")
         if num.shape[1] < 2:
             print(f"  skip {fp.name} (< 2 numeric cols)")
@@ -39,21 +110,22 @@ def within_dataset_correlations():
 
 # ── 2.  Cross-dataset correlation (daily) ────────────────────────────────
 
-def cross_dataset_daily():
+def cross_dataset_daily(save_merged=True):
     """
     Merge the daily-frequency datasets on date and compute the
-    correlation matrix across all key series.
+    correlation matrix across all key series.  With save_merged=False the
+    (large) merged_daily.csv is left for the caller to write.
     """
     print("\n── Cross-dataset correlation (daily frequency) ────────────")
 
     # BSE SENSEX
-    bse = pd.read_csv(PROC_DIR / "BSE_SENSEX_processed.csv", parse_dates=["Date"])
+    bse = read_processed("BSE_SENSEX_processed.csv", parse_dates=["Date"])
     bse.rename(columns={"Date": "date"}, inplace=True)
     bse = bse[["date", "Close", "log_Close", "log_return_Close"]].copy()
     bse.columns = ["date", "bse_close", "log_bse_close", "logret_bse_close"]
 
     # Daily market data (nifty, s&p500, gold, brent, usd/inr)
-    dm = pd.read_csv(PROC_DIR / "daily_market_data_processed.csv", parse_dates=["date"])
+    dm = read_processed("daily_market_data_processed.csv", parse_dates=["date"])
     dm_cols = ["date",
                "nifty50_close", "sp500_close", "gold_close", "brent_close", "usd_inr_close",
                "log_nifty50_close", "log_sp500_close", "log_gold_close", "log_brent_close", "log_usd_inr_close",
@@ -62,18 +134,18 @@ def cross_dataset_daily():
     dm = dm[[c for c in dm_cols if c in dm.columns]]
 
     # Crude oil
-    co = pd.read_csv(PROC_DIR / "crude_oil_price_processed.csv", parse_dates=["date"])
+    co = read_processed("crude_oil_price_processed.csv", parse_dates=["date"])
     co = co[["date", "price", "log_price", "log_return_price"]].copy()
     co.columns = ["date", "crude_price", "log_crude_price", "logret_crude_price"]
     # Resample to daily (it's monthly – forward fill to daily for join)
     co = co.set_index("date").resample("D").ffill().reset_index()
 
     # DGS10
-    dgs = pd.read_csv(PROC_DIR / "DGS10_processed.csv", parse_dates=["date"])
+    dgs = read_processed("DGS10_processed.csv", parse_dates=["date"])
     dgs = dgs[["date", "DGS10", "log_DGS10", "log_return_DGS10"]]
 
     # DHHNGSP
-    dhh = pd.read_csv(PROC_DIR / "DHHNGSP_processed.csv", parse_dates=["date"])
+    dhh = read_processed("DHHNGSP_processed.csv", parse_dates=["date"])
     dhh = dhh[["date", "DHHNGSP", "log_DHHNGSP", "log_return_DHHNGSP"]]
 
     # Merge all on date
@@ -106,8 +178,8 @@ def cross_dataset_daily():
     print(f"  ✓ cross_daily_corr_log_returns.csv      {corr_logret.shape[0]}×{corr_logret.shape[1]}")
 
     # Save the merged daily dataset too
-    merged.reset_index().to_csv(OUT_DIR / "merged_daily.csv", index=False)
-    print(f"  ✓ merged_daily.csv                      {len(merged):,} rows × {len(merged.columns)} cols")
+    if save_merged:
+        save_merged_frame(merged, "merged_daily.csv")
 
     return merged
 
@@ -121,25 +193,25 @@ def cross_dataset_monthly():
     """
     print("\n── Cross-dataset correlation (monthly frequency) ──────────")
 
-    mm = pd.read_csv(PROC_DIR / "monthly_macro_data_processed.csv", parse_dates=["date"])
+    mm = read_processed("monthly_macro_data_processed.csv", parse_dates=["date"])
 
     # Bring in crude oil (already monthly)
-    co = pd.read_csv(PROC_DIR / "crude_oil_price_processed.csv", parse_dates=["date"])
+    co = read_processed("crude_oil_price_processed.csv", parse_dates=["date"])
     co = co[["date", "price", "log_price", "log_return_price"]].copy()
     co.columns = ["date", "crude_price", "log_crude_price", "logret_crude_price"]
     co["date"] = co["date"].dt.to_period("M").dt.to_timestamp()
 
     # DHHNGSP – resample to monthly mean
-    dhh = pd.read_csv(PROC_DIR / "DHHNGSP_processed.csv", parse_dates=["date"])
+    dhh = read_processed("DHHNGSP_processed.csv", parse_dates=["date"])
     dhh_m = dhh.set_index("date")[["DHHNGSP","log_DHHNGSP"]].resample("MS").mean().reset_index()
     dhh_m.rename(columns={"date": "date"}, inplace=True)
 
     # DGS10 – resample to monthly mean
-    dgs = pd.read_csv(PROC_DIR / "DGS10_processed.csv", parse_dates=["date"])
+    dgs = read_processed("DGS10_processed.csv", parse_dates=["date"])
     dgs_m = dgs.set_index("date")[["DGS10","log_DGS10"]].resample("MS").mean().reset_index()
 
     # BSE – resample to monthly last close
-    bse = pd.read_csv(PROC_DIR / "BSE_SENSEX_processed.csv", parse_dates=["Date"])
+    bse = read_processed("BSE_SENSEX_processed.csv", parse_dates=["Date"])
     bse.rename(columns={"Date": "date"}, inplace=True)
     bse_m = bse.set_index("date")[["Close","log_Close"]].resample("MS").last().reset_index()
     bse_m.columns = ["date", "bse_close", "log_bse_close"]
@@ -173,8 +245,7 @@ def cross_dataset_monthly():
         corr_logret.to_csv(OUT_DIR / "cross_monthly_corr_log_returns.csv")
         print(f"  ✓ cross_monthly_corr_log_returns.csv    {corr_logret.shape[0]}×{corr_logret.shape[1]}")
 
-    merged.reset_index().to_csv(OUT_DIR / "merged_monthly.csv", index=False)
-    print(f"  ✓ merged_monthly.csv                    {len(merged):,} rows × {len(merged.columns)} cols")
+    save_merged_frame(merged, "merged_monthly.csv")
 
     return merged
 
@@ -184,8 +255,8 @@ def cross_dataset_annual():
     """Merge annual-frequency datasets (india_macro, henry_hub)."""
     print("\n── Cross-dataset correlation (annual frequency) ───────────")
 
-    im = pd.read_csv(PROC_DIR / "india_macro_worldbank_processed.csv")
-    hh = pd.read_csv(PROC_DIR / "Henry_Hub_annual_processed.csv")
+    im = read_processed("india_macro_worldbank_processed.csv")
+    hh = read_processed("Henry_Hub_annual_processed.csv")
     hh.columns = ["Year", "henry_hub_price", "log_henry_hub", "logret_henry_hub"]
 
     merged = pd.merge(im, hh, on="Year", how="outer").sort_values("Year")
@@ -228,6 +299,12 @@ def main():
     monthly_merged = cross_dataset_monthly()
     cross_dataset_annual()
 
+    # Imported here: both modules import this one
+    import ewma_correlations as ewma
+    import rolling_beta
+    ewma.update_all(daily_merged)
+    rolling_beta.compute_all({"daily": daily_merged, "monthly": monthly_merged})
+
     # Show highlights
     print("\n" + "=" * 80)
     print("KEY FINDINGS")
@@ -0,0 +1,220 @@
+"""
+CORA – Exponentially-weighted (EWMA) correlation engine
+=========================================================
+Alternative to the fixed 30D–180D rolling windows: every observation
+updates a running exponentially-weighted mean vector and N×N covariance
+matrix in O(N²),
+
+    d     = x - mean
+    mean += (1 - λ) · d
+    cov   = λ · (cov + (1 - λ) · d dᵀ),        λ = 0.5 ** (1 / half-life)
+
+(pandas ``ewm(halflife=h, adjust=False).cov(bias=True)``), and the
+correlation matrix is read straight off the covariance.  The state is
+persisted per half-life, so a daily run only feeds the rows after the
+last processed date instead of recomputing the history.
+
+Assets are the close-price columns of merged_daily.csv (same as
+export_rolling).  For every half-life this writes to Datasets/correlations/
+  • ewma_state_<label>.npz  – engine state (mean, cov, count, last date)
+  • ewma_corr_<label>.csv   – per-pair correlation history (appended)
+
+merged_daily is forward-filled to the newest date of any series, so its
+last rows are placeholders for every series that lags.  Only rows up to
+the last date on which every asset has a real observation are fed
+(compute_correlations.last_complete_date); the rest wait until the late
+values arrive.  If rows that were already fed change (back-filled or
+revised history) the state is rebuilt from scratch.
+
+Run:  python Datasets/ewma_correlations.py [--full]
+"""
+
+import argparse, warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from compute_correlations import close_columns, last_complete_date
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+CORR_DIR = Path(__file__).parent / "correlations"
+
+# label → half-life in observations (days for merged_daily)
+HALFLIVES = {"HL10": 10, "HL30": 30, "HL90": 90}
+CURRENT_LABEL = "HL30"  # half-life used for the "current" figures
+
+# ── engine ───────────────────────────────────────────────────────────────
+
+class EWMACorrelation:
+    """Streaming exponentially-weighted covariance / correlation of N series."""
+
+    def __init__(self, names, halflife):
+        self.names = list(names)
+        self.halflife = float(halflife)
+        self.lam = 0.5 ** (1.0 / self.halflife)
+        n = len(self.names)
+        self.mean = np.zeros(n)
+        self.cov = np.zeros((n, n))
+        self.count = 0
+        self.last_date = None
+        self.digest = 0  # hash of the rows fed so far (see update_all)
+
+    @property
+    def pairs(self):
+        """Upper-triangle (i, j) index arrays, in the order of pair_labels."""
+        return np.triu_indices(len(self.names), k=1)
+
+    @property
+    def pair_labels(self):
+        i, j = self.pairs
+        return [f"{self.names[a]} / {self.names[b]}" for a, b in zip(i, j)]
+
+    def update(self, x, date=None):
+        """Feed one observation (length-N vector) – O(N²)."""
+        x = np.asarray(x, dtype=float)
+        if self.count == 0:
+            self.mean = x.copy()
+        else:
+            d = x - self.mean
+            a = 1.0 - self.lam
+            self.mean += a * d
+            self.cov *= self.lam
+            self.cov += (self.lam * a) * np.outer(d, d)
+        self.count += 1
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+
+    def corr(self):
+        """Current N×N correlation matrix (NaN where a series is still flat)."""
+        sd = np.sqrt(np.diag(self.cov))
+        denom = np.outer(sd, sd)
+        out = np.full_like(self.cov, np.nan)
+        np.divide(self.cov, denom, out=out, where=denom > 0)
+        return np.clip(out, -1.0, 1.0, out=out)
+
+    def run(self, frame, min_periods=None):
+        """
+        Feed every row of a date-indexed frame (columns = self.names) and
+        return the per-pair correlation after each step as a DataFrame.
+        Steps before *min_periods* observations (default: one half-life)
+        are NaN, like the warm-up of a rolling window.
+        """
+        min_periods = self.halflife if min_periods is None else min_periods
+        i, j = self.pairs
+        values = frame[self.names].to_numpy(dtype=float)
+        out = np.full((len(values), len(i)), np.nan)
+        for t, x in enumerate(values):
+            self.update(x)
+            if self.count >= min_periods:
+                out[t] = self.corr()[i, j]
+        if len(frame):
+            self.last_date = pd.Timestamp(frame.index[-1])
+        return pd.DataFrame(out, index=frame.index, columns=self.pair_labels)
+
+    # ── persistence ──
+
+    def save(self, path):
+        np.savez(path, names=np.array(self.names), halflife=self.halflife,
+                 mean=self.mean, cov=self.cov, count=self.count, digest=np.uint64(self.digest),
+                 last_date=str(self.last_date) if self.last_date is not None else "")
+
+    @classmethod
+    def load(cls, path):
+        z = np.load(path, allow_pickle=False)
+        eng = cls(z["names"].tolist(), float(z["halflife"]))
+        eng.mean, eng.cov, eng.count = z["mean"], z["cov"], int(z["count"])
+        eng.digest = int(z["digest"])
+        last = str(z["last_date"])
+        eng.last_date = pd.Timestamp(last) if last else None
+        return eng
+
+# ── pipeline stage ───────────────────────────────────────────────────────
+
+def state_path(label):
+    return CORR_DIR / f"ewma_state_{label}.npz"
+
+def history_path(label):
+    return CORR_DIR / f"ewma_corr_{label}.csv"
+
+# label → per-pair history kept in memory by a resident process (watch.py)
+_history_cache = {}
+
+def digest(frame):
+    """Order-sensitive hash of a frame's index and values."""
+    return int(pd.util.hash_pandas_object(frame).to_numpy().sum(dtype=np.uint64))
+
+def update_all(merged=None, full=False):
+    """
+    Bring every half-life's state and history up to date with *merged*
+    (date-indexed daily frame; read from merged_daily.csv when not given).
+    Only complete rows after the stored last date are processed, unless
+    *full* or the rows already fed no longer hash to the stored digest
+    (history was revised or back-filled), in which case everything is
+    recomputed.  Returns True if any state or history changed.
+    """
+    print("\n── EWMA correlations ───────────────────────────────────────")
+    if merged is None:
+        merged = pd.read_csv(CORR_DIR / "merged_daily.csv", parse_dates=["date"])
+        merged.sort_values("date", inplace=True)
+        merged.set_index("date", inplace=True)
+    names = close_columns(merged)
+    merged = merged.loc[merged.index <= last_complete_date(merged, names), names]
+
+    updated = False
+    for label, hl in HALFLIVES.items():
+        sp, hp = state_path(label), history_path(label)
+        eng = None
+        if not full and sp.exists() and hp.exists():
+            eng = EWMACorrelation.load(sp)
+            if eng.names != names or eng.halflife != hl or eng.last_date is None:
+                eng = None  # asset set / configuration changed → recompute
+            elif digest(merged.loc[merged.index <= eng.last_date]) != eng.digest:
+                eng = None  # already-fed rows were revised → recompute
+        if eng is None:
+            eng = EWMACorrelation(names, hl)
+            hist = eng.run(merged)
+            hist.index.name = "date"
+            hist.to_csv(hp)
+            _history_cache[label] = hist
+            mode = "full"
+        else:
+            new = merged.loc[merged.index > eng.last_date]
+            hist = eng.run(new)
+            if len(hist):
+                hist.to_csv(hp, mode="a", header=False)
+                if label in _history_cache:
+                    _history_cache[label] = pd.concat([_history_cache[label], hist])
+            mode = "incremental"
+        updated |= mode == "full" or len(hist) > 0
+        eng.digest = digest(merged.loc[merged.index <= eng.last_date])
+        eng.save(sp)
+        print(f"  ✓ {label:5s} half-life={hl:>4g}  {mode:11s} +{len(hist):,} rows  "
+              f"(through {eng.last_date.date() if eng.last_date is not None else '-'})")
+    return updated
+
+def load_history(label):
+    """Per-pair correlation history for one half-life."""
+    if label not in _history_cache:
+        _history_cache[label] = pd.read_csv(history_path(label), parse_dates=["date"], index_col="date")
+    return _history_cache[label]
+
+# ── main ─────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Update EWMA correlation state and histories")
+    ap.add_argument("--full", action="store_true", help="recompute from scratch instead of incrementally")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("CORA – EWMA correlation engine")
+    print("=" * 80)
+    update_all(full=args.full)
+
+    eng = EWMACorrelation.load(state_path(CURRENT_LABEL))
+    corr = pd.DataFrame(eng.corr(), index=eng.names, columns=eng.names)
+    print(f"\n  Current {CURRENT_LABEL} correlation matrix ({eng.last_date.date()})")
+    print(corr.round(3).to_string())
+
+if __name__ == "__main__":
+    main()
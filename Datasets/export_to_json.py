@@ -7,11 +7,15 @@ to  app/public/data/  so the frontend can fetch them directly.
 Run:  python Datasets/export_to_json.py
 """
 
-import json, warnings
+import json, os, warnings
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
+import ewma_correlations as ewma
+import rolling_beta
+from compute_correlations import close_columns, last_complete_date
+
 warnings.filterwarnings("ignore")
 
 PROC_DIR = Path(__file__).parent / "processed"
@@ -20,11 +24,23 @@ OUT_DIR  = Path(__file__).parent.parent / "app" / "public" / "data"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 def save_json(obj, name):
+    """Write *obj* to OUT_DIR/name atomically (temp file + rename)."""
     fp = OUT_DIR / name
-    with open(fp, "w") as f:
-        json.dump(obj, f, default=str, allow_nan=False)
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    tmp = fp.with_name(f".{fp.name}.tmp")
+    # dumps() goes through the C encoder; dump() to a file does not
+    with open(tmp, "w") as f:
+        f.write(json.dumps(obj, default=str, allow_nan=False))
+    os.replace(tmp, fp)
     print(f"  ✓ {name}")
 
+def prune_details(subdir, keep):
+    """Delete detail files under OUT_DIR/subdir/ whose names are not in *keep*."""
+    for fp in (OUT_DIR / subdir).glob("*.json"):
+        if f"{subdir}/{fp.name}" not in keep:
+            fp.unlink()
+            print(f"  ✗ {subdir}/{fp.name} (stale)")
+
 # ── 1. Dashboard KPIs ────────────────────────────────────────────────────
 
 def export_dashboard():
@@ -110,42 +126,172 @@ def export_heatmap():
 
 # ── 3. Rolling correlation time-series ───────────────────────────────────
 
-def export_rolling():
-    merged = pd.read_csv(CORR_DIR / "merged_daily.csv", parse_dates=["date"])
-    merged.sort_values("date", inplace=True)
-    merged.set_index("date", inplace=True)
+# Target point counts of the per-pair downsampling pyramid.  The coarsest
+# level is inlined in rolling_correlations.json (overview chart); the finer
+# ones go to rolling/<pair>.json, which RollingCorrelationPage fetches only
+# when zoomed in.
+PYRAMID_LEVELS = [500, 2000, 8000]
+
+def lttb(x, Y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of every row of *Y*
+    (m × n, or a single series) against the shared *x*.  Returns an
+    (m, n_out) array with, per row, the indices of the points that best
+    preserve the visual shape (peaks and troughs included) of the
+    polyline (x, y).
+    """
+    Y = np.atleast_2d(Y)
+    m, n = Y.shape
+    if n_out >= n or n_out < 3:
+        return np.tile(np.arange(n), (m, 1))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    # Third vertex of every bucket's triangle: mean of the next bucket
+    # (the last point for the final bucket), broadcast to its points.
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(Y[:, 1:n - 1], edges[:-1] - 1, axis=1)
+    cx = np.repeat(np.append((sums_x / counts)[1:], x[-1]), counts)
+    cy = np.repeat(np.column_stack([(sums_y / counts)[:, 1:], Y[:, -1]]), counts, axis=1)
+    # Twice the triangle area for candidate p, given the previously chosen
+    # point a, is |xa*U[p] + ya*V[p] + W[p]|.  U, V, W are vectorised; only
+    # the choice of a is sequential, and that step runs for all rows at once.
+    px, py = x[1:n - 1], Y[:, 1:n - 1]
+    U = py - cy
+    V = cx - px
+    W = px * cy - cx * py
+    keep = np.empty((m, n_out), dtype=np.int64)
+    keep[:, 0], keep[:, -1] = 0, n - 1
+    rows = np.arange(m)
+    xa, ya = np.full(m, x[0]), Y[:, 0]
+    lo_hi = (edges - 1).tolist()
+    for b, (lo, hi) in enumerate(zip(lo_hi[:-1], lo_hi[1:]), start=1):
+        area = np.abs(xa[:, None] * U[:, lo:hi] + ya[:, None] * V[lo:hi] + W[:, lo:hi])
+        arg = lo + area.argmax(axis=1)
+        keep[:, b] = arg + 1
+        xa, ya = px[arg], py[rows, arg]
+    return keep
+
+def pyramids(frame, levels=PYRAMID_LEVELS):
+    """
+    LTTB pyramids of every column of a date-indexed frame, as
+    {column: {level: [{date, corr}, …]}} with non-finite points dropped.
+    Columns with the same finite rows are downsampled together.  A level
+    is skipped once the next-coarser PYRAMID_LEVELS entry already held
+    every point of the series.
+    """
+    values = frame.to_numpy(dtype=float)
+    finite = np.isfinite(values)
+    days = frame.index.values.astype("datetime64[D]")
+    day_str = np.datetime_as_string(days, unit="D")
+    groups = {}
+    for j in range(values.shape[1]):
+        groups.setdefault(finite[:, j].tobytes(), []).append(j)
+    out = {}
+    for cols in groups.values():
+        mask = finite[:, cols[0]]
+        n = int(mask.sum())
+        x = days[mask].astype(np.int64).astype(float)
+        Y = values[mask][:, cols].T
+        dates = day_str[mask]
+        res = [out.setdefault(frame.columns[j], {}) for j in cols]
+        for n_out in levels:
+            k = PYRAMID_LEVELS.index(n_out)
+            if k and n <= PYRAMID_LEVELS[k - 1]:
+                break  # finer levels would just repeat the full series
+            idx = lttb(x, Y, n_out)
+            for r, pyramid in enumerate(res):
+                pyramid[str(n_out)] = [
+                    {"date": d, "corr": v}
+                    for d, v in zip(dates[idx[r]].tolist(), np.round(Y[r, idx[r]], 4).tolist())
+                ]
+    return out
+
+# Detail-file jobs waiting for flush_details(); a resident process
+# (watch.py) writes them after the inline JSON has been swapped in.
+_pending_details = []
+
+def queue_details(frames, files):
+    """
+    Queue detail files holding the finer pyramid levels.  *frames* maps a
+    label (window, half-life) to a frame with one column per series;
+    *files* maps detail file name → (header, {label: column}), where a
+    column may also be a {field: column} dict.
+    """
+    _pending_details.append((frames, files))
+
+def flush_details():
+    """Build the queued finer levels (batched per frame) and write the detail files."""
+    while _pending_details:
+        frames, files = _pending_details.pop(0)
+        levels = {label: pyramids(f, PYRAMID_LEVELS[1:]) for label, f in frames.items()}
+        for name, (header, cols) in files.items():
+            out = {label: ({field: levels[label][c] for field, c in col.items()}
+                           if isinstance(col, dict) else levels[label][col])
+                   for label, col in cols.items()}
+            save_json({**header, "levels": out}, name)
+
+# (a, b) → (hash of the pair's input rows, pair_data); lets a resident
+# process (see watch.py) skip pairs whose inputs did not change.
+_rolling_cache = {}
+
+def export_rolling(merged=None, defer=False):
+    """
+    Rolling correlations for every close-price pair.  *merged* is the
+    date-indexed daily frame from compute_correlations; read from
+    merged_daily.csv when not given.  Each pair stops at the last date on
+    which both series have a real observation: the forward-filled rows
+    after it are placeholders, and leaving them out keeps a pair (and its
+    cache entry) unchanged when another series extends the calendar.
+    With *defer* the detail files are left for flush_details().
+    """
+    if merged is None:
+        merged = pd.read_csv(CORR_DIR / "merged_daily.csv", parse_dates=["date"])
+        merged.sort_values("date", inplace=True)
+        merged.set_index("date", inplace=True)
 
     # Identify close-price columns
-    close_cols = [c for c in merged.columns if c.endswith("_close") and not c.startswith("log")]
-    if not close_cols:
-        close_cols = [c for c in merged.columns if "close" in c.lower() or "price" in c.lower() or "DGS10" in c or "DHHNGSP" in c]
-        close_cols = [c for c in close_cols if not c.startswith("log")]
+    close_cols = close_columns(merged)
+    pairs = [(close_cols[i], close_cols[j])
+             for i in range(len(close_cols)) for j in range(i + 1, len(close_cols))]
 
-    # Compute rolling correlations for all unique pairs, multiple windows
+    # Compute rolling correlations for the changed pairs, multiple windows
     windows = {"30D": 30, "60D": 60, "90D": 90, "180D": 180}
-    all_pairs = []
-    pair_labels = []
-
-    for i in range(len(close_cols)):
-        for j in range(i + 1, len(close_cols)):
-            a, b = close_cols[i], close_cols[j]
-            pair_labels.append(f"{a} / {b}")
-            pair_data = {"pair": f"{a} / {b}", "a": a, "b": b}
-            for wlabel, wsize in windows.items():
-                roll = merged[a].rolling(wsize).corr(merged[b])
-                # Downsample to weekly for lighter JSON
-                roll_w = roll.resample("W").last().dropna()
-                pair_data[wlabel] = [
-                    {"date": str(d.date()), "corr": round(float(v), 4)}
-                    for d, v in roll_w.items()
-                    if np.isfinite(v)
-                ]
+    coarse = str(PYRAMID_LEVELS[0])
+    todo = {}
+    for a, b in pairs:
+        pair = merged.loc[merged.index <= last_complete_date(merged, [a, b]), [a, b]]
+        key = int(pd.util.hash_pandas_object(pair).sum())
+        cached = _rolling_cache.get((a, b))
+        if not (cached and cached[0] == key):
+            todo[(a, b)] = (key, pair)
+
+    if todo:
+        # One frame per window with a column per pair, downsampled together
+        rolls = {wlabel: pd.DataFrame({f"{a} / {b}": pair[a].rolling(wsize).corr(pair[b])
+                                       for (a, b), (_, pair) in todo.items()})
+                 for wlabel, wsize in windows.items()}
+        # LTTB pyramid keeps correlation breakdowns at every level
+        inline = {wlabel: pyramids(roll, PYRAMID_LEVELS[:1]) for wlabel, roll in rolls.items()}
+        details = {}
+        for (a, b), (key, pair) in todo.items():
+            label = f"{a} / {b}"
+            detail_name = f"rolling/{a}__{b}.json"
+            pair_data = {"pair": label, "a": a, "b": b,
+                         "detail": detail_name, "levels": PYRAMID_LEVELS}
+            for wlabel in windows:
+                pair_data[wlabel] = inline[wlabel][label][coarse]
             # Current correlation (latest 60-day)
-            cur = merged[a].tail(60).corr(merged[b])
+            cur = pair[a].tail(60).corr(pair[b])
             pair_data["current"] = round(float(cur), 4) if np.isfinite(cur) else 0
-            all_pairs.append(pair_data)
+            _rolling_cache[(a, b)] = (key, pair_data)
+            details[detail_name] = ({"pair": label, "a": a, "b": b}, {w: label for w in windows})
+        queue_details(rolls, details)
 
+    all_pairs = [_rolling_cache[p][1] for p in pairs]
+    prune_details("rolling", {p["detail"] for p in all_pairs})
     save_json({"pairs": all_pairs, "assets": close_cols}, "rolling_correlations.json")
+    if not defer:
+        flush_details()
 
 # ── 4. Cluster data ─────────────────────────────────────────────────────
 
@@ -197,17 +343,148 @@ def export_clusters():
 
 # ── 5. Within-dataset correlations (for per-dataset heatmaps) ────────────
 
+# file name → (mtime, entry); only rewritten matrices are re-read
+_within_cache = {}
+
 def export_within_dataset():
     results = {}
     for fp in sorted(CORR_DIR.glob("corr_*_processed.csv")):
-        corr = pd.read_csv(fp, index_col=0)
         name = fp.stem.replace("corr_", "").replace("_processed", "")
+        mtime = fp.stat().st_mtime_ns
+        cached = _within_cache.get(fp.name)
+        if cached and cached[0] == mtime:
+            results[name] = cached[1]
+            continue
+        corr = pd.read_csv(fp, index_col=0)
         assets = list(corr.columns)
         matrix = [[round(v, 4) if not np.isnan(v) else 0 for v in row] for row in corr.values.tolist()]
         results[name] = {"assets": assets, "matrix": matrix}
+        _within_cache[fp.name] = (mtime, results[name])
 
     save_json(results, "within_dataset_correlations.json")
 
+# ── 6. EWMA correlations ─────────────────────────────────────────────────
+
+# pair → (hash of its histories, pair_data); same role as _rolling_cache
+_ewma_cache = {}
+
+def export_ewma(defer=False):
+    """
+    Same layout as rolling_correlations.json, with half-life labels (HL10,
+    HL30, …) in place of window labels, plus the full current matrix per
+    half-life.  Finer pyramid levels go to ewma/<a>__<b>.json (left for
+    flush_details() with *defer*).
+    """
+    if not ewma.state_path(ewma.CURRENT_LABEL).exists():
+        return
+    engines = {label: ewma.EWMACorrelation.load(ewma.state_path(label)) for label in ewma.HALFLIVES}
+    histories = {label: ewma.load_history(label) for label in ewma.HALFLIVES}
+    current = engines[ewma.CURRENT_LABEL]
+    coarse = str(PYRAMID_LEVELS[0])
+
+    todo = {}
+    for pair in current.pair_labels:
+        key = int(pd.util.hash_pandas_object(
+            pd.concat([h[pair] for h in histories.values()], axis=1)).sum())
+        cached = _ewma_cache.get(pair)
+        if not (cached and cached[0] == key):
+            todo[pair] = key
+
+    if todo:
+        frames = {label: hist[list(todo)] for label, hist in histories.items()}
+        inline = {label: pyramids(frame, PYRAMID_LEVELS[:1]) for label, frame in frames.items()}
+        details = {}
+        for pair, key in todo.items():
+            a, b = pair.split(" / ")
+            detail_name = f"ewma/{a}__{b}.json"
+            pair_data = {"pair": pair, "a": a, "b": b,
+                         "detail": detail_name, "levels": PYRAMID_LEVELS}
+            for label in histories:
+                pair_data[label] = inline[label][pair][coarse]
+            cur = histories[ewma.CURRENT_LABEL][pair].iloc[-1]
+            pair_data["current"] = round(float(cur), 4) if np.isfinite(cur) else 0
+            _ewma_cache[pair] = (key, pair_data)
+            details[detail_name] = ({"pair": pair, "a": a, "b": b}, {label: pair for label in histories})
+        queue_details(frames, details)
+
+    all_pairs = [_ewma_cache[pair][1] for pair in current.pair_labels]
+    prune_details("ewma", {p["detail"] for p in all_pairs})
+
+    matrices = {}
+    for label, eng in engines.items():
+        matrix = [[round(v, 4) if not np.isnan(v) else 0 for v in row] for row in eng.corr().tolist()]
+        matrices[label] = {"assets": eng.names, "matrix": matrix, "halflife": eng.halflife}
+
+    save_json({"pairs": all_pairs, "assets": current.names, "halflives": ewma.HALFLIVES,
+               "matrices": matrices, "lastDate": str(current.last_date.date())},
+              "ewma_correlations.json")
+    if not defer:
+        flush_details()
+
+# ── 7. Rolling betas / hedge ratios ──────────────────────────────────────
+
+# detail file → (hash of the target's result columns, entry); same role as _rolling_cache
+_betas_cache = {}
+
+def export_betas(defer=False):
+    """
+    One entry per (frequency, model, target) with β per factor and R² for
+    every window, as LTTB pyramids like the rolling correlations.  Finer
+    levels go to betas/<freq>__<model>__<target>.json (left for
+    flush_details() with *defer*).
+    """
+    coarse = str(PYRAMID_LEVELS[0])
+    entries = []
+    for freq, windows in rolling_beta.WINDOWS.items():
+        for model, factors in rolling_beta.MODELS.items():
+            results = {w: rolling_beta.load_result(freq, model, w) for w in windows}
+            results = {w: r for w, r in results.items() if r is not None}
+            if not results:
+                continue
+            targets = sorted({c.split("|")[0] for r in results.values() for c in r.columns})
+            fields = [f"beta_{f}" for f in factors] + ["r2"]
+            last_w = list(results)[-1]
+
+            todo = {}
+            for target in targets:
+                detail_name = f"betas/{freq}__{model}__{target}.json"
+                key = int(pd.util.hash_pandas_object(pd.concat(
+                    [res[[c for c in res.columns if c.startswith(f"{target}|")]] for res in results.values()],
+                    axis=1)).sum())
+                cached = _betas_cache.get(detail_name)
+                if not (cached and cached[0] == key):
+                    todo[target] = (detail_name, key)
+
+            if todo:
+                frames = {w: res[[f"{t}|{f}" for t in todo for f in fields]] for w, res in results.items()}
+                inline = {w: pyramids(frame, PYRAMID_LEVELS[:1]) for w, frame in frames.items()}
+                details = {}
+                latest = results[last_w].iloc[-1]
+                for target, (detail_name, key) in todo.items():
+                    entry = {"freq": freq, "model": model, "target": target, "factors": factors,
+                             "detail": detail_name, "levels": PYRAMID_LEVELS}
+                    for wlabel in results:
+                        entry[wlabel] = {field: inline[wlabel][f"{target}|{field}"][coarse] for field in fields}
+                    entry["current"] = {
+                        "window": last_w,
+                        "beta": {f: round(float(latest[f"{target}|beta_{f}"]), 4)
+                                 for f in factors if np.isfinite(latest[f"{target}|beta_{f}"])},
+                        "r2": round(float(latest[f"{target}|r2"]), 4) if np.isfinite(latest[f"{target}|r2"]) else 0,
+                    }
+                    _betas_cache[detail_name] = (key, entry)
+                    details[detail_name] = ({"freq": freq, "model": model, "target": target},
+                                            {w: {field: f"{target}|{field}" for field in fields} for w in results})
+                queue_details(frames, details)
+            entries.extend(_betas_cache[f"betas/{freq}__{model}__{t}.json"][1] for t in targets)
+
+    prune_details("betas", {e["detail"] for e in entries})
+    if entries:
+        save_json({"series": entries, "models": rolling_beta.MODELS,
+                   "windows": {f: list(w) for f, w in rolling_beta.WINDOWS.items()}},
+                  "rolling_betas.json")
+    if not defer:
+        flush_details()
+
 # ── main ─────────────────────────────────────────────────────────────────
 
 def main():
@@ -219,6 +496,8 @@ def main():
     export_rolling()
     export_clusters()
     export_within_dataset()
+    export_ewma()
+    export_betas()
     n = len(list(OUT_DIR.glob("*.json")))
     print(f"\n  Done – {n} JSON files in {OUT_DIR.resolve()}")
 
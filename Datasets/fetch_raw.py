@@ -0,0 +1,460 @@
+"""
+CORA – Raw-data fetcher
+========================
+Downloads / refreshes the API-backed raw files concurrently instead of
+placing them in Datasets/raw/ by hand:
+
+  • DGS10.csv, DHHNGSP.csv                – FRED (fredgraph.csv)
+  • Henry_Hub_Natural_Gas_Spot_Price.csv   – EIA API v2 (annual RNGWHHD)
+  • india_macro_worldbank.csv              – World Bank API (9 indicators)
+
+All requests share one pooled aiohttp session (keep-alive, bounded per
+host) and run concurrently.  Only new observations are transferred:
+each source asks for the date range starting at the last observation
+already on disk (re-fetching that one to pick up revisions), and repeats
+of an identical request carry If-None-Match / If-Modified-Since so an
+unchanged source costs a 304.  Validators live in raw/.fetch_state.json
+and are only stored once the source's file has been written, so a failed
+fetch never hides its data behind 304s.
+Files are rewritten atomically in exactly the layout the process_*
+loaders in preprocess.py expect.
+
+A stand-in server that emulates the three APIs from the bundled CSVs is
+included, so the whole path can be exercised offline:
+
+Run:  python Datasets/fetch_raw.py                      # refresh raw/
+      python Datasets/fetch_raw.py --full               # ignore local data / validators
+      python Datasets/fetch_raw.py --serve 8765         # stand-in server over raw/
+      python Datasets/fetch_raw.py --base-url http://127.0.0.1:8765 --raw-dir /tmp/raw
+      python Datasets/fetch_raw.py --self-test          # stand-in + full vs incremental run
+
+The EIA API needs a key in the EIA_API_KEY environment variable.
+"""
+
+import argparse, asyncio, hashlib, io, json, os, tempfile, time, warnings
+from datetime import date, datetime
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import urlencode
+
+import aiohttp
+from aiohttp import web
+import pandas as pd
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+RAW_DIR = Path(__file__).parent / "raw"
+STATE_NAME = ".fetch_state.json"
+
+API_ROOTS = {
+    "fred":      "https://fred.stlouisfed.org/graph/fredgraph.csv",
+    "eia":       "https://api.eia.gov/v2/natural-gas/pri/fut/data/",
+    "worldbank": "https://api.worldbank.org/v2",
+}
+# Same endpoints on the stand-in server, relative to --base-url
+STANDIN_PATHS = {
+    "fred":      "/fred/graph/fredgraph.csv",
+    "eia":       "/eia/v2/natural-gas/pri/fut/data/",
+    "worldbank": "/worldbank/v2",
+}
+
+# india_macro_worldbank.csv column → World Bank indicator code
+WB_INDICATORS = {
+    "cpi":               "FP.CPI.TOTL",
+    "gdp_growth":        "NY.GDP.MKTP.KD.ZG",
+    "gdp_usd":           "NY.GDP.MKTP.CD",
+    "unemployment":      "SL.UEM.TOTL.ZS",
+    "capital_formation": "NE.GDI.TOTL.ZS",
+    "exports_pct_gdp":   "NE.EXP.GNFS.ZS",
+    "imports_pct_gdp":   "NE.IMP.GNFS.ZS",
+    "gov_consumption":   "NE.CON.GOVT.ZS",
+    "current_account":   "BN.CAB.XOKA.GD.ZS",
+}
+
+SOURCES = {
+    "DGS10.csv":   {"kind": "fred", "series": "DGS10"},
+    "DHHNGSP.csv": {"kind": "fred", "series": "DHHNGSP"},
+    "Henry_Hub_Natural_Gas_Spot_Price.csv": {"kind": "eia", "series": "RNGWHHD"},
+    "india_macro_worldbank.csv": {"kind": "worldbank", "country": "IND", "first_year": 1991},
+}
+
+# Header block of the EIA file (process_henry_hub_annual skips 4 lines)
+EIA_HEADER = [
+    "Henry Hub Natural Gas Spot Price",
+    "https://www.eia.gov/dnav/ng/hist/rngwhhdA.htm",
+    "",  # retrieval time
+    "Data Source: Thomson Reuters",
+    "Year,Henry Hub Natural Gas Spot Price Dollars per Million Btu",
+]
+
+# ── helpers ──────────────────────────────────────────────────────────────
+
+def write_atomic(fp, text):
+    """
+    Write *text* to *fp* via a temp file in the same directory + rename.
+    Returns False (and leaves the file untouched) if nothing changed, so
+    mtime-based watchers (watch.py) only see real updates.
+    """
+    fp = Path(fp)
+    if fp.exists() and fp.read_text() == text:
+        return False
+    with tempfile.NamedTemporaryFile("w", dir=fp.parent, prefix=f".{fp.name}.", suffix=".tmp",
+                                     delete=False, newline="") as f:
+        f.write(text)
+    os.replace(f.name, fp)
+    return True
+
+def fmt_value(v, spec=None):
+    """
+    Number as the bundled CSVs print it: float repr like pandas' to_csv by
+    default, or a format *spec* (the EIA file drops trailing .0); '' when missing.
+    """
+    if v is None or v == "":
+        return ""
+    return format(float(v), spec) if spec else repr(float(v))
+
+class Fetcher:
+    """Shared session, conditional-request state and transfer statistics."""
+
+    def __init__(self, session, roots, raw_dir, state, full=False):
+        self.session = session
+        self.roots = roots
+        self.raw_dir = Path(raw_dir)
+        self.state = state
+        self.full = full
+        self.stats = {}
+        self.pending = {}  # name → {key: new validators}, merged into state by commit()
+
+    def stat(self, name):
+        return self.stats.setdefault(name, {"requests": 0, "not_modified": 0, "bytes": 0, "seconds": 0.0,
+                                            "full_bytes": 0, "full_seconds": 0.0, "new_rows": 0})
+
+    async def get(self, name, key, url, params, ranged, secret=None):
+        """
+        GET with If-None-Match / If-Modified-Since when the same URL was
+        fetched before.  Returns the body, or None on 304 Not Modified.
+        Size and duration of the last full (*ranged* False) download are
+        remembered per key as the baseline for the savings report.
+        *secret* params (API keys) are sent but left out of the stored and
+        compared URL, so they never reach the state file and rotating a
+        key keeps the validators.  New validators wait in *pending* until
+        commit(name).
+        """
+        full_url = f"{url}?{urlencode(params)}"
+        send_url = f"{url}?{urlencode({**params, **secret})}" if secret else full_url
+        old = self.state.get(key, {})
+        entry = self.pending.setdefault(name, {}).setdefault(key, {})
+        headers = {}
+        if not self.full and old.get("url") == full_url:
+            if old.get("etag"):
+                headers["If-None-Match"] = old["etag"]
+            if old.get("last_modified"):
+                headers["If-Modified-Since"] = old["last_modified"]
+        st = self.stat(name)
+        t0 = time.perf_counter()
+        body = None
+        async with self.session.get(send_url, headers=headers) as resp:
+            st["requests"] += 1
+            if resp.status == 304:
+                st["not_modified"] += 1
+            else:
+                resp.raise_for_status()
+                body = await resp.read()
+                entry.update(url=full_url, etag=resp.headers.get("ETag"),
+                             last_modified=resp.headers.get("Last-Modified"))
+        elapsed = time.perf_counter() - t0
+        if body is not None:
+            st["bytes"] += len(body)
+            if not ranged:
+                entry.update(full_bytes=len(body), full_seconds=elapsed)
+        st["seconds"] += elapsed
+        st["full_bytes"] += entry.get("full_bytes", old.get("full_bytes", 0))
+        st["full_seconds"] += entry.get("full_seconds", old.get("full_seconds", 0.0))
+        return body
+
+    def commit(self, name):
+        """
+        Store the validators of *name*'s requests once its file is written
+        (or found unchanged).  A source that raised is never committed, so
+        its previous validators, which still describe the file on disk, stay.
+        """
+        for key, entry in self.pending.pop(name, {}).items():
+            self.state.setdefault(key, {}).update(entry)
+
+# ── per-source fetchers ──────────────────────────────────────────────────
+
+async def fetch_fred(f, name, src):
+    """FRED series: request from the last stored date on (cosd)."""
+    fp = f.raw_dir / name
+    old = None
+    if fp.exists() and not f.full:
+        old = pd.read_csv(fp, dtype=str, keep_default_na=False)
+    params = {"id": src["series"]}
+    if old is not None and len(old):
+        params["cosd"] = old["observation_date"].iloc[-1]
+    body = await f.get(name, name, f.roots["fred"], params, ranged="cosd" in params)
+    if body is None:
+        return False
+    new = pd.read_csv(io.BytesIO(body), dtype=str, keep_default_na=False)
+    new.columns = ["observation_date", src["series"]]
+    if "cosd" in params:
+        keep = old[old["observation_date"] < params["cosd"]]
+        out = pd.concat([keep, new], ignore_index=True)
+    else:
+        out = new
+    f.stat(name)["new_rows"] = len(out) - (len(old) if old is not None else 0)
+    return write_atomic(fp, out.to_csv(index=False, lineterminator="\n"))
+
+async def fetch_worldbank(f, name, src):
+    """World Bank indicators, one concurrent request each, from the last stored year on."""
+    fp = f.raw_dir / name
+    old = None
+    if fp.exists() and not f.full:
+        old = pd.read_csv(fp, dtype=str, keep_default_na=False).set_index("year")
+    start = int(old.index[-1]) if old is not None and len(old) else src["first_year"]
+    root = f"{f.roots['worldbank']}/country/{src['country']}/indicator"
+    params = {"format": "json", "date": f"{start}:{date.today().year}", "per_page": 1000}
+
+    ranged = start != src["first_year"]
+    bodies = await asyncio.gather(*[
+        f.get(name, f"{name}:{code}", f"{root}/{code}", params, ranged) for code in WB_INDICATORS.values()
+    ])
+    if all(b is None for b in bodies):
+        return False
+
+    # year → {column: value}, starting from what is on disk
+    table = old.to_dict(orient="index") if old is not None else {}
+    for col, body in zip(WB_INDICATORS, bodies):
+        if body is None:  # unchanged since last fetch → stored values are current
+            continue
+        payload = json.loads(body)
+        for row in (payload[1] if len(payload) > 1 and payload[1] else []):
+            table.setdefault(str(row["date"]), {})[col] = fmt_value(row["value"])
+    # Years the API lists without any value yet are not observations
+    years = sorted((y for y, vals in table.items() if any(vals.values())), key=int)
+    out = pd.DataFrame([{"year": y, **{c: table[y].get(c, "") for c in WB_INDICATORS}} for y in years])
+    f.stat(name)["new_rows"] = len(out) - (len(old) if old is not None else 0)
+    return write_atomic(fp, out.to_csv(index=False, lineterminator="\n"))
+
+async def fetch_eia(f, name, src):
+    """EIA API v2 annual spot price, from the last stored year on."""
+    fp = f.raw_dir / name
+    header, rows = list(EIA_HEADER), {}
+    if fp.exists() and not f.full:
+        lines = fp.read_text().splitlines()
+        header = lines[:5]
+        rows = dict(line.split(",", 1) for line in lines[5:] if line.strip())
+    params = {"frequency": "annual", "data[0]": "value", "facets[series][]": src["series"]}
+    if rows:
+        params["start"] = max(rows, key=int)
+    body = await f.get(name, name, f.roots["eia"], params, ranged="start" in params,
+                       secret={"api_key": os.environ.get("EIA_API_KEY", "")})
+    if body is None:
+        return False
+    before = dict(rows)
+    for rec in json.loads(body)["response"]["data"]:
+        if rec.get("value") not in (None, ""):
+            rows[str(rec["period"])[:4]] = fmt_value(rec["value"], ".15g")
+    f.stat(name)["new_rows"] = len(rows) - len(before)
+    if rows == before and fp.exists():
+        return False
+    header[2] = datetime.now().astimezone().strftime("%H:%M:%S GMT%z")
+    body_lines = [f"{y},{rows[y]}" for y in sorted(rows, key=int, reverse=True)]
+    return write_atomic(fp, "\n".join(header + body_lines))  # source file has no trailing newline
+
+FETCHERS = {"fred": fetch_fred, "worldbank": fetch_worldbank, "eia": fetch_eia}
+
+# ── driver ───────────────────────────────────────────────────────────────
+
+async def fetch_all(raw_dir=RAW_DIR, base_url=None, full=False, only=None, verbose=True):
+    """Refresh every configured source concurrently; returns {name: stats}."""
+    raw_dir = Path(raw_dir)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    state_fp = raw_dir / STATE_NAME
+    state = json.loads(state_fp.read_text()) if state_fp.exists() else {}
+    roots = dict(API_ROOTS)
+    if base_url:
+        roots = {k: base_url.rstrip("/") + p for k, p in STANDIN_PATHS.items()}
+
+    names = [n for n in SOURCES if not only or n in only]
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=6)
+    timeout = aiohttp.ClientTimeout(total=120)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        f = Fetcher(session, roots, raw_dir, state, full)
+        results = await asyncio.gather(
+            *[FETCHERS[SOURCES[n]["kind"]](f, n, SOURCES[n]) for n in names],
+            return_exceptions=True)
+
+    for n, res in zip(names, results):
+        st = f.stat(n)
+        st["updated"] = res is True
+        st["error"] = f"{type(res).__name__}: {res}" if isinstance(res, Exception) else None
+        if not st["error"]:
+            f.commit(n)
+    write_atomic(state_fp, json.dumps(state, indent=1))
+    if verbose:
+        report(f.stats)
+    return f.stats
+
+def report(stats):
+    """
+    Per-source transfer summary.  "full" is the size of the last full
+    download of the same requests, the baseline for bytes / time saved.
+    """
+    print(f"  {'source':40s} {'req':>4s} {'304':>4s} {'bytes':>10s} {'full':>10s} {'new rows':>8s}")
+    print("  " + "-" * 80)
+    for n, st in stats.items():
+        if st["error"]:
+            print(f"  ✗ {n:38s} {st['error']}")
+            continue
+        print(f"  {'✓' if st['updated'] else '='} {n:38s} {st['requests']:>4d} {st['not_modified']:>4d} "
+              f"{st['bytes']:>10,} {st['full_bytes']:>10,} {st['new_rows']:>8,}")
+    ok = [st for st in stats.values() if not st["error"]]
+    sent, full = sum(st["bytes"] for st in ok), sum(st["full_bytes"] for st in ok)
+    # Requests overlap, so compare summed request times, not wall-clock
+    secs, full_secs = sum(st["seconds"] for st in ok), sum(st["full_seconds"] for st in ok)
+    print("  " + "-" * 80)
+    print(f"  transferred {sent:,} of {full:,} bytes ({100 * (1 - sent / full) if full else 0:.1f}% saved); "
+          f"request time {secs:.3f} s vs {full_secs:.3f} s for full downloads (saved {full_secs - secs:.3f} s)")
+
+# ── stand-in server ──────────────────────────────────────────────────────
+
+def make_standin_app(data_dir=RAW_DIR):
+    """
+    aiohttp app emulating the FRED, EIA and World Bank endpoints from the
+    CSVs in *data_dir*, with date-range filtering, ETag and Last-Modified.
+    """
+    data_dir = Path(data_dir)
+
+    def conditional(request, fp, text, content_type):
+        etag = '"' + hashlib.sha1(text.encode()).hexdigest()[:16] + '"'
+        last_mod = formatdate(fp.stat().st_mtime, usegmt=True)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_mod})
+        return web.Response(text=text, content_type=content_type,
+                            headers={"ETag": etag, "Last-Modified": last_mod})
+
+    async def fred(request):
+        series = request.query["id"]
+        fp = data_dir / f"{series}.csv"
+        df = pd.read_csv(fp, dtype=str, keep_default_na=False)
+        if "cosd" in request.query:
+            df = df[df["observation_date"] >= request.query["cosd"]]
+        return conditional(request, fp, df.to_csv(index=False, lineterminator="\n"), "text/csv")
+
+    async def eia(request):
+        fp = data_dir / "Henry_Hub_Natural_Gas_Spot_Price.csv"
+        df = pd.read_csv(fp, skiprows=4, dtype=str)
+        df.columns = ["period", "value"]
+        if "start" in request.query:
+            df = df[df["period"].astype(int) >= int(request.query["start"])]
+        data = [{"period": p, "series": "RNGWHHD", "value": v} for p, v in zip(df["period"], df["value"])]
+        return conditional(request, fp, json.dumps({"response": {"total": len(data), "data": data}}),
+                           "application/json")
+
+    async def worldbank(request):
+        col = {code: c for c, code in WB_INDICATORS.items()}[request.match_info["code"]]
+        fp = data_dir / "india_macro_worldbank.csv"
+        df = pd.read_csv(fp)
+        lo, hi = (int(y) for y in request.query.get("date", "0:9999").split(":"))
+        df = df[(df["year"] >= lo) & (df["year"] <= hi)].sort_values("year", ascending=False)
+        rows = [{"indicator": {"id": request.match_info["code"]}, "date": str(y),
+                 "value": None if pd.isna(v) else float(v)} for y, v in zip(df["year"], df[col])]
+        meta = {"page": 1, "pages": 1, "per_page": 1000, "total": len(rows)}
+        return conditional(request, fp, json.dumps([meta, rows]), "application/json")
+
+    app = web.Application()
+    app.router.add_get(STANDIN_PATHS["fred"], fred)
+    app.router.add_get(STANDIN_PATHS["eia"], eia)
+    app.router.add_get(STANDIN_PATHS["worldbank"] + "/country/{country}/indicator/{code}", worldbank)
+    return app
+
+async def start_standin(port=0, data_dir=RAW_DIR):
+    """Start the stand-in server; returns (runner, base_url)."""
+    runner = web.AppRunner(make_standin_app(data_dir))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+async def self_test():
+    """
+    Serve the bundled CSVs and fetch them into a scratch directory: a full
+    download, a ranged refresh, a conditional (304) refresh, and a refresh
+    after the newest observation of every file was dropped.  The result
+    must be identical to the bundled files; bytes and time are compared.
+    """
+    runner, base = await start_standin()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = {}
+            for label, full in [("full download", True), ("ranged refresh, no news", False),
+                                ("conditional refresh (304)", False)]:
+                print(f"\n── {label} " + "─" * (56 - len(label)))
+                t0 = time.perf_counter()
+                stats = await fetch_all(tmp, base, full=full)
+                runs[label] = (stats, time.perf_counter() - t0)
+
+            # Drop the newest observation of every file, as if it had not
+            # been published at the time of the previous fetch.
+            for n in SOURCES:
+                fp = Path(tmp) / n
+                lines = fp.read_text().splitlines()
+                if n.startswith("Henry_Hub"):
+                    write_atomic(fp, "\n".join(lines[:5] + lines[6:]))
+                else:
+                    write_atomic(fp, "\n".join(lines[:-1]) + "\n")
+            label = "+1 observation per file"
+            print(f"\n── {label} " + "─" * (56 - len(label)))
+            t0 = time.perf_counter()
+            stats = await fetch_all(tmp, base)
+            runs[label] = (stats, time.perf_counter() - t0)
+
+            print()
+            for n in SOURCES:
+                a = (Path(tmp) / n).read_text().splitlines()
+                b = (RAW_DIR / n).read_text().splitlines()
+                if n.startswith("Henry_Hub"):  # line 3 is the retrieval time
+                    del a[2], b[2]
+                print(f"  {'✓' if a == b else '✗'} {n} identical to the bundled file")
+    finally:
+        await runner.cleanup()
+
+    print("\n" + "=" * 80)
+    t_full = runs["full download"][1]
+    for label, (stats, secs) in runs.items():
+        sent = sum(st["bytes"] for st in stats.values())
+        n_304 = sum(st["not_modified"] for st in stats.values())
+        print(f"  {label:28s} {sent:>10,} bytes  {n_304:>2d}×304  {secs:.3f} s"
+              + (f"  (saved {t_full - secs:.3f} s)" if secs < t_full else ""))
+
+# ── main ─────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Fetch / refresh API-backed raw datasets")
+    ap.add_argument("--raw-dir", default=RAW_DIR, help="where to write the raw files")
+    ap.add_argument("--base-url", help="stand-in server root instead of the real APIs")
+    ap.add_argument("--full", action="store_true", help="ignore local data and validators")
+    ap.add_argument("--only", nargs="+", choices=list(SOURCES), help="subset of files to refresh")
+    ap.add_argument("--serve", type=int, metavar="PORT", help="run the stand-in server over raw/")
+    ap.add_argument("--self-test", action="store_true", help="fetch from an in-process stand-in server")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("CORA – Raw-data fetcher")
+    print("=" * 80)
+
+    if args.serve:
+        print(f"  Stand-in server on http://127.0.0.1:{args.serve} serving {RAW_DIR.resolve()}")
+        web.run_app(make_standin_app(), host="127.0.0.1", port=args.serve, print=None)
+    elif args.self_test:
+        asyncio.run(self_test())
+    else:
+        print(f"  Output   : {Path(args.raw_dir).resolve()}")
+        print(f"  Sources  : {args.base_url or 'live APIs'}")
+        print("-" * 80)
+        asyncio.run(fetch_all(args.raw_dir, args.base_url, args.full, args.only))
+
+if __name__ == "__main__":
+    main()
@@ -272,6 +272,21 @@ def process_monthly_macro():
     df.to_csv(OUT_DIR / "monthly_macro_data_processed.csv", index=False)
     return df
 
+# raw file → (loader, processed file it writes); watch.py uses this to
+# re-run only the loader whose raw file changed.
+LOADERS = {
+    "BSE SENSEX.csv":                       (process_bse_sensex,       "BSE_SENSEX_processed.csv"),
+    "CPI_dataset.csv":                      (process_cpi,              "CPI_processed.csv"),
+    "crude-oil-price.csv":                  (process_crude_oil,        "crude_oil_price_processed.csv"),
+    "daily_market_data.csv":                (process_daily_market,     "daily_market_data_processed.csv"),
+    "DGS10.csv":                            (process_dgs10,            "DGS10_processed.csv"),
+    "DHHNGSP.csv":                          (process_dhhngsp,          "DHHNGSP_processed.csv"),
+    "exchange_rates.csv":                   (process_exchange_rates,   "exchange_rates_processed.csv"),
+    "Henry_Hub_Natural_Gas_Spot_Price.csv": (process_henry_hub_annual, "Henry_Hub_annual_processed.csv"),
+    "india_macro_worldbank.csv":            (process_india_macro,      "india_macro_worldbank_processed.csv"),
+    "monthly_macro_data.csv":               (process_monthly_macro,    "monthly_macro_data_processed.csv"),
+}
+
 # ── master pipeline ──────────────────────────────────────────────────────
 
 def main():
@@ -282,16 +297,8 @@ def main():
     print(f"  Output   : {OUT_DIR.resolve()}")
     print("-" * 80)
 
-    process_bse_sensex()
-    process_cpi()
-    process_crude_oil()
-    process_daily_market()
-    process_dgs10()
-    process_dhhngsp()
-    process_exchange_rates()
-    process_henry_hub_annual()
-    process_india_macro()
-    process_monthly_macro()
+    for loader, _ in LOADERS.values():
+        loader()
 
     print("-" * 80)
     n_files = len(list(OUT_DIR.glob("*.csv")))
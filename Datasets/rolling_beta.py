@@ -0,0 +1,268 @@
+"""
+CORA – Rolling beta / hedge-ratio engine
+=========================================
+Rolling OLS of every target series on one or more reference benchmarks,
+
+    r_target = α + Σ_k β_k · r_factor_k + ε      (log-returns, per window)
+
+computed for all targets at once.  The normal equations only need
+windowed sums of Z·Zᵀ, Z·y and y² (Z = [1, factors]); these come from
+cumulative sums, so every (date, target) system is built in O(1) and the
+whole batch is solved with one stacked ``np.linalg.solve`` instead of a
+regression per window.
+
+Returns are first differences of the log-level columns (log_*) of
+merged_daily.csv / merged_monthly.csv, named without the "log_" prefix
+(e.g. DHHNGSP, brent_close).  Rows after the factors' last real
+observation only carry forward-filled placeholders and are left out.
+Results (β per factor, α, R²) are written to
+Datasets/correlations/rolling_beta_<freq>_<model>_<window>.csv.
+
+The default models (MODELS) are part of the normal pipeline and are
+exported to the app; --factors runs ad-hoc models instead.
+
+Run:  python Datasets/rolling_beta.py
+      python Datasets/rolling_beta.py --factors DGS10 --factors brent_close,sp500_close
+      python Datasets/rolling_beta.py --bench 300 5000
+"""
+
+import argparse, time, warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from compute_correlations import last_complete_date, log_returns
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+CORR_DIR = Path(__file__).parent / "correlations"
+
+# model name → reference benchmarks (factors); every other series is a target
+MODELS = {
+    "brent":       ["brent_close"],
+    "sp500":       ["sp500_close"],
+    "brent_sp500": ["brent_close", "sp500_close"],
+}
+WINDOWS = {
+    "daily":   {"90D": 90, "180D": 180},
+    "monthly": {"36M": 36},
+}
+
+# ── engine ───────────────────────────────────────────────────────────────
+
+def rolling_sum(A, window):
+    """Trailing *window*-row sums along axis 0 (NaN until the window is full)."""
+    c = np.cumsum(A, axis=0)
+    out = c.copy()
+    out[window:] -= c[:-window]
+    out[:window - 1] = np.nan
+    return out
+
+def rolling_ols(Y, X, window):
+    """
+    Rolling OLS with intercept of every column of *Y* (T×M) on the columns
+    of *X* (T×K).  Returns (beta T×M×K, alpha T×M, r2 T×M); rows before
+    the first full window, and windows where a factor is flat, are NaN.
+    """
+    Y = np.asarray(Y, dtype=float)
+    X = np.asarray(X, dtype=float)
+    T, M = Y.shape
+    K = X.shape[1]
+    # Centring leaves slopes and R² unchanged and keeps the running sums small
+    x_mean, y_mean = X.mean(axis=0), Y.mean(axis=0)
+    Xc, Yc = X - x_mean, Y - y_mean
+    Z = np.column_stack([np.ones(T), Xc])                        # T × (K+1)
+
+    ZZ = rolling_sum(Z[:, :, None] * Z[:, None, :], window)      # T × (K+1) × (K+1)
+    ZY = rolling_sum(Z[:, :, None] * Yc[:, None, :], window)     # T × (K+1) × M
+    YY = rolling_sum(Yc * Yc, window)                            # T × M
+
+    beta = np.full((T, M, K), np.nan)
+    alpha = np.full((T, M), np.nan)
+    r2 = np.full((T, M), np.nan)
+
+    full = np.arange(T) >= window - 1
+    # Windowed factor variances (× window); flat factors → singular system
+    fvar = np.diagonal(ZZ, axis1=1, axis2=2)[:, 1:] - ZZ[:, 0, 1:] ** 2 / window
+    ok = full & (fvar > 1e-12 * window).all(axis=1)
+    if not ok.any():
+        return beta, alpha, r2
+    try:
+        coef = np.linalg.solve(ZZ[ok], ZY[ok])                  # n × (K+1) × M
+    except np.linalg.LinAlgError:  # collinear factors in some window
+        coef = np.linalg.pinv(ZZ[ok]) @ ZY[ok]
+
+    beta[ok] = coef[:, 1:, :].transpose(0, 2, 1)
+    alpha[ok] = coef[:, 0, :] + y_mean - beta[ok] @ x_mean
+    # Residual SS from the normal equations: yᵀy − bᵀZᵀy
+    ssr = YY[ok] - (coef * ZY[ok]).sum(axis=1)
+    sst = YY[ok] - ZY[ok][:, 0, :] ** 2 / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2[ok] = np.where(sst > 0, 1.0 - ssr / sst, np.nan)
+    return beta, alpha, r2
+
+# ── pipeline stage ───────────────────────────────────────────────────────
+
+def load_merged(freq):
+    """Date-indexed merged_{freq}.csv."""
+    merged = pd.read_csv(CORR_DIR / f"merged_{freq}.csv", parse_dates=["date"])
+    merged.sort_values("date", inplace=True)
+    merged.set_index("date", inplace=True)
+    return merged
+
+def result_path(freq, model, wlabel):
+    return CORR_DIR / f"rolling_beta_{freq}_{model}_{wlabel}.csv"
+
+def run_model(rets, factors, window):
+    """Regress every non-factor column on *factors*; columns are "<target>|beta_<factor>", "|alpha", "|r2"."""
+    targets = [c for c in rets.columns if c not in factors]
+    beta, alpha, r2 = rolling_ols(rets[targets].values, rets[factors].values, window)
+    cols = {}
+    for m, t in enumerate(targets):
+        for k, f in enumerate(factors):
+            cols[f"{t}|beta_{f}"] = beta[:, m, k]
+        cols[f"{t}|alpha"] = alpha[:, m]
+        cols[f"{t}|r2"] = r2[:, m]
+    out = pd.DataFrame(cols, index=rets.index)
+    return out.iloc[window - 1:]
+
+# (freq, model) → hash of the returns last regressed; a resident process
+# (watch.py) skips models whose inputs did not change
+_input_cache = {}
+
+# (freq, model, window) → latest result frame, kept so exports and a
+# resident process do not round-trip through the CSVs
+_results = {}
+
+def compute_all(frames=None, models=None, save=True):
+    """
+    Run every model × window.  *frames* maps frequency → date-indexed
+    merged frame (every frequency in WINDOWS is read from merged_<freq>.csv
+    when not given); *models* defaults to MODELS.  Results are kept in
+    memory (load_result) and, with *save*, written to the CSVs; otherwise
+    the caller writes them later with save_results.  Returns the
+    (freq, model, window) keys that were recomputed.
+    """
+    print("\n── Rolling betas ───────────────────────────────────────────")
+    models = MODELS if models is None else models
+    if frames is None:
+        frames = {freq: load_merged(freq) for freq in WINDOWS}
+    changed = []
+    for freq, merged in frames.items():
+        windows = WINDOWS[freq]
+        rets = log_returns(merged).dropna(axis=1, how="any")
+        for model, factors in models.items():
+            if any(f not in rets.columns for f in factors):
+                print(f"  skip {freq}/{model} (missing factor)")
+                continue
+            rets_m = rets.loc[rets.index <= last_complete_date(merged, [f"log_{f}" for f in factors])]
+            key = int(pd.util.hash_pandas_object(rets_m).sum())
+            if _input_cache.get((freq, model)) == key:
+                print(f"  = {freq:7s} {model:12s} unchanged")
+                continue
+            for wlabel, wsize in windows.items():
+                t0 = time.perf_counter()
+                out = run_model(rets_m, factors, wsize)
+                dt = time.perf_counter() - t0
+                _results[(freq, model, wlabel)] = out
+                changed.append((freq, model, wlabel))
+                n_t = len(rets_m.columns) - len(factors)
+                print(f"  ✓ {freq:7s} {model:12s} {wlabel:5s} {n_t} targets × {len(out):,} dates  ({dt*1e3:.0f} ms)")
+            _input_cache[(freq, model)] = key
+    if save:
+        save_results(changed)
+    return changed
+
+def save_results(keys):
+    """Write the in-memory results of the given (freq, model, window) keys to their CSVs."""
+    for key in keys:
+        _results[key].to_csv(result_path(*key))
+
+def load_result(freq, model, wlabel):
+    """Result frame of one model × window: from memory, else from its CSV (None if missing)."""
+    key = (freq, model, wlabel)
+    if key not in _results:
+        fp = result_path(*key)
+        if not fp.exists():
+            return None
+        _results[key] = pd.read_csv(fp, parse_dates=["date"], index_col="date")
+    return _results[key]
+
+def print_latest(models):
+    """Latest β and R² per target for the last window of each frequency."""
+    for freq, windows in WINDOWS.items():
+        wlabel = list(windows)[-1]
+        for model, factors in models.items():
+            res = load_result(freq, model, wlabel)
+            if res is None:
+                continue
+            latest = res.iloc[-1]
+            print(f"\n  {freq} {model} ({wlabel}, {res.index[-1].date()})")
+            for target in dict.fromkeys(c.split("|")[0] for c in res.columns):
+                betas = "  ".join(f"β_{f}={latest[f'{target}|beta_{f}']:+.3f}" for f in factors)
+                print(f"    {target:22s} {betas}  R²={latest[f'{target}|r2']:.3f}")
+
+# ── benchmark ────────────────────────────────────────────────────────────
+
+def bench(n_targets, n_dates, window=180, n_factors=2, n_check=50):
+    """Batched engine vs per-window least-squares loops on synthetic data."""
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((n_dates, n_factors))
+    B = rng.standard_normal((n_factors, n_targets))
+    Y = X @ B + rng.standard_normal((n_dates, n_targets))
+
+    t0 = time.perf_counter()
+    beta, alpha, r2 = rolling_ols(Y, X, window)
+    t_batch = time.perf_counter() - t0
+
+    # References, timed on *n_check* windows and extrapolated to the full
+    # history: one lstsq per window with all targets as right-hand sides,
+    # and one per (window, target) – the statsmodels-per-window pattern.
+    ends = np.linspace(window - 1, n_dates - 1, n_check).astype(int)
+    n_windows = n_dates - window + 1
+    err = 0.0
+    t0 = time.perf_counter()
+    for e in ends:
+        Z = np.column_stack([np.ones(window), X[e - window + 1:e + 1]])
+        coef = np.linalg.lstsq(Z, Y[e - window + 1:e + 1], rcond=None)[0]
+        err = max(err, np.abs(coef[1:].T - beta[e]).max())
+    t_window = (time.perf_counter() - t0) / n_check * n_windows
+
+    sample = range(min(n_targets, 10))
+    t0 = time.perf_counter()
+    for e in ends:
+        Z = np.column_stack([np.ones(window), X[e - window + 1:e + 1]])
+        for m in sample:
+            np.linalg.lstsq(Z, Y[e - window + 1:e + 1, m], rcond=None)
+    t_pair = (time.perf_counter() - t0) / (n_check * len(sample)) * n_windows * n_targets
+
+    print(f"  targets={n_targets:,}  dates={n_dates:,}  window={window}  factors={n_factors}")
+    print(f"  batched            : {t_batch:8.3f} s")
+    print(f"  per window         : {t_window:8.3f} s (extrapolated)   ×{t_window / t_batch:,.0f}")
+    print(f"  per window × target: {t_pair:8.3f} s (extrapolated)   ×{t_pair / t_batch:,.0f}")
+    print(f"  max |Δβ| vs lstsq: {err:.2e}")
+
+# ── main ─────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Rolling OLS betas / hedge ratios against reference benchmarks")
+    ap.add_argument("--factors", action="append", metavar="A[,B…]",
+                    help="reference benchmarks of an ad-hoc model (repeatable; replaces MODELS, not exported)")
+    ap.add_argument("--bench", nargs=2, type=int, metavar=("TARGETS", "DATES"),
+                    help="benchmark on synthetic data instead of running the pipeline")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("CORA – Rolling beta / hedge-ratio engine")
+    print("=" * 80)
+    if args.bench:
+        bench(*args.bench)
+        return
+    models = MODELS
+    if args.factors:
+        models = {"+".join(f.split(",")): f.split(",") for f in args.factors}
+    compute_all(models=models)
+    print_latest(models)
+
+if __name__ == "__main__":
+    main()
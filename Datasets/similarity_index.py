@@ -0,0 +1,266 @@
+"""
+CORA – "Most-correlated-to" similarity index
+=============================================
+Answers "which benchmarks track this series most closely over the last
+N months?" without scanning a full correlation matrix.
+
+Pearson correlation over a window is the dot product of the two series
+once each is centred and scaled to unit length, so the index keeps one
+z-normalised row per return series (float32, series × window) and a
+k-nearest-correlated query is a single matrix-vector product followed by
+a partial sort.  That is exact and stays well under a millisecond at
+thousands of series.  New series can be appended at any time.
+
+Every benchmark is indexed once, as the log-returns of its log-level
+column (e.g. DHHNGSP, brent_close, crude_price), so a query is never
+matched against transforms of itself.  The window ends at the last date
+on which every live series has a real observation (the forward-filled
+tail is left out), and series that are flat over the window are skipped.
+Uploaded series are prices by default and converted to log-returns.
+
+Run:  python Datasets/similarity_index.py DHHNGSP --months 12 --k 10
+      python Datasets/similarity_index.py --csv brent_prices.csv
+      python Datasets/similarity_index.py --bench 5000
+"""
+
+import argparse, time, warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from compute_correlations import last_complete_date, log_returns
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+CORR_DIR = Path(__file__).parent / "correlations"
+
+# ── helpers ──────────────────────────────────────────────────────────────
+
+def znormalize(X):
+    """Centre every row and scale it to unit L2 norm (flat rows → zeros)."""
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    X = X - X.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(X, axis=1, keepdims=True)
+    out = np.zeros_like(X)
+    np.divide(X, norm, out=out, where=norm > 0)
+    return out.astype(np.float32)
+
+# ── index ────────────────────────────────────────────────────────────────
+
+class CorrelationIndex:
+    """
+    k-nearest-correlated lookup over a fixed date window.
+
+    Every stored row is a z-normalised copy of one series restricted to
+    *dates*; correlation with a query is then ``rows @ q``.
+    """
+
+    def __init__(self, dates, capacity=64):
+        self.dates = pd.DatetimeIndex(dates)
+        self.names = []
+        self._pos = {}
+        self._rows = np.zeros((capacity, len(self.dates)), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._pos
+
+    @property
+    def vectors(self):
+        return self._rows[:len(self.names)]
+
+    def _grow(self, n_new):
+        need = len(self.names) + n_new
+        if need <= len(self._rows):
+            return
+        cap = max(need, 2 * len(self._rows))
+        rows = np.zeros((cap, len(self.dates)), dtype=np.float32)
+        rows[:len(self.names)] = self.vectors
+        self._rows = rows
+
+    def add(self, names, values):
+        """
+        Add (or replace) series.  *values* is a (len(names), len(dates))
+        array already aligned to the index window.  Series that are flat
+        over the window have no defined correlation and are not added;
+        their names are returned.
+        """
+        names = [names] if isinstance(names, str) else list(names)
+        Z = znormalize(values)
+        if Z.shape != (len(names), len(self.dates)):
+            raise ValueError(f"expected shape {(len(names), len(self.dates))}, got {Z.shape}")
+        flat = ~Z.any(axis=1)
+        self._grow(int((~flat).sum()))
+        for name, z in zip(np.array(names, dtype=object)[~flat], Z[~flat]):
+            i = self._pos.get(name)
+            if i is None:
+                i = len(self.names)
+                self._pos[name] = i
+                self.names.append(name)
+            self._rows[i] = z
+        return [n for n, f in zip(names, flat) if f]
+
+    def add_frame(self, df, levels=False):
+        """Add every column of a date-indexed frame, aligned to the window."""
+        aligned = self.align(df, levels)
+        return self.add(list(aligned.columns), aligned.values.T)
+
+    def align(self, obj, levels=False):
+        """
+        Log-returns of a date-indexed Series/DataFrame over the index dates.
+        *obj* holds log-returns, or price levels when *levels* is set.  The
+        series is turned into a cumulative log path, carried forward onto
+        the index dates and differenced, so returns on dates the index
+        lacks are summed into the next index date and index dates without
+        an observation get 0 rather than a repeat of the previous return.
+        """
+        obj = obj.sort_index()
+        path = np.log(obj) if levels else obj.cumsum()
+        path = path.reindex(path.index.union(self.dates)).ffill()
+        before = path.index[path.index < self.dates[0]]
+        keys = self.dates if before.empty else before[-1:].append(self.dates)
+        return path.reindex(keys).diff().reindex(self.dates).fillna(0.0)
+
+    def query(self, values, k=10, exclude=(), absolute=False):
+        """Return the *k* most correlated stored series as ``[(name, r), …]``."""
+        q = znormalize(values)[0]
+        if not q.any():
+            raise ValueError("query series is flat over the index window")
+        scores = self.vectors @ q
+        rank = np.abs(scores) if absolute else scores.copy()
+        for name in exclude:
+            if name in self._pos:
+                rank[self._pos[name]] = -np.inf
+        k = min(k, len(self.names) - sum(n in self._pos for n in exclude))
+        if k <= 0:
+            return []
+        top = np.argpartition(-rank, k - 1)[:k]
+        top = top[np.argsort(-rank[top])]
+        return [(self.names[i], round(float(scores[i]), 4)) for i in top]
+
+    def query_name(self, name, k=10, absolute=False):
+        """Nearest neighbours of a stored series (the series itself excluded)."""
+        if name not in self._pos:
+            raise KeyError(f"{name!r} is not in the index")
+        return self.query(self.vectors[self._pos[name]], k, exclude=[name], absolute=absolute)
+
+    def query_series(self, series, k=10, absolute=False, levels=True):
+        """
+        Nearest neighbours of an external date-indexed series: prices by
+        default, or log-returns with levels=False.
+        """
+        return self.query(self.align(series, levels).values, k, absolute=absolute)
+
+# ── building from the merged datasets ────────────────────────────────────
+
+def load_returns(freq="daily"):
+    """
+    One log-return series per benchmark of merged_{freq}.csv, up to the
+    last date on which every live series has a real observation.
+    """
+    merged = pd.read_csv(CORR_DIR / f"merged_{freq}.csv", parse_dates=["date"])
+    merged.sort_values("date", inplace=True)
+    merged.set_index("date", inplace=True)
+    rets = log_returns(merged)
+    end = last_complete_date(merged, [f"log_{c}" for c in rets.columns])
+    return rets.loc[rets.index <= end]
+
+def build_index(freq="daily", months=12, returns=None):
+    """
+    Build a CorrelationIndex over the last *months* months of returns.
+    Returns (index, names of the series skipped as flat over the window).
+    """
+    if returns is None:
+        returns = load_returns(freq)
+    start = returns.index.max() - pd.DateOffset(months=months)
+    dates = returns.index[returns.index > start]
+    index = CorrelationIndex(dates, capacity=max(64, returns.shape[1]))
+    skipped = index.add_frame(returns)
+    return index, skipped
+
+def resolve_name(index, name):
+    """Accept a bare benchmark name (e.g. DHHNGSP) as well as a column name."""
+    if name in index:
+        return name
+    hits = [n for n in index.names if n.endswith(name) or name in n]
+    if not hits:
+        raise KeyError(f"{name!r} is not in the index; known: {', '.join(index.names)}")
+    return hits[0]
+
+# ── benchmark ────────────────────────────────────────────────────────────
+
+def bench(n_series, window=252, n_queries=200, k=10):
+    """Time k-NN queries on *n_series* synthetic random-walk return series."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end="2024-12-31", periods=window)
+    factors = rng.standard_normal((8, window))
+    X = rng.standard_normal((n_series, 8)) @ factors + rng.standard_normal((n_series, window))
+
+    t0 = time.perf_counter()
+    index = CorrelationIndex(dates)
+    index.add([f"s{i}" for i in range(n_series)], X)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(n_queries):
+        index.query_name(f"s{i % n_series}", k)
+    t_query = (time.perf_counter() - t0) / n_queries
+
+    print(f"  series={n_series:,}  window={window}  build={t_build*1e3:.1f} ms  "
+          f"query={t_query*1e6:.0f} µs (k={k})")
+
+# ── main ─────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Most-correlated-to lookup over benchmark return series")
+    ap.add_argument("series", nargs="?", help="series to look up, e.g. DHHNGSP or brent_close")
+    ap.add_argument("--freq", choices=["daily", "monthly"], default="daily")
+    ap.add_argument("--months", type=int, default=12, help="look-back window in months")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--abs", action="store_true", help="rank by |r| instead of r")
+    ap.add_argument("--csv", help="external CSV (date, price) to query instead of a stored series")
+    ap.add_argument("--returns", action="store_true", help="the --csv values are log-returns, not prices")
+    ap.add_argument("--bench", type=int, metavar="N", help="benchmark queries on N synthetic series")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("CORA – Most-correlated-to similarity index")
+    print("=" * 80)
+
+    if args.bench:
+        bench(args.bench)
+        return
+
+    index, skipped = build_index(args.freq, args.months)
+    print(f"  {len(index)} {args.freq} return series, window "
+          f"{index.dates.min().date()} → {index.dates.max().date()} ({len(index.dates)} obs)")
+    if skipped:
+        print(f"  skipped (flat over the window): {', '.join(skipped)}")
+
+    t0 = time.perf_counter()
+    if args.csv:
+        ext = pd.read_csv(args.csv, index_col=0, parse_dates=True).iloc[:, 0]
+        target = Path(args.csv).name
+        try:
+            hits = index.query_series(ext, args.k, absolute=args.abs, levels=not args.returns)
+        except ValueError as e:
+            ap.error(f"{args.csv}: {e}")
+    elif args.series:
+        try:
+            target = resolve_name(index, args.series)
+        except KeyError as e:
+            ap.error(e.args[0])
+        hits = index.query_name(target, args.k, absolute=args.abs)
+    else:
+        ap.error("give a series name or --csv")
+    dt = time.perf_counter() - t0
+
+    print(f"\n  Top-{args.k} correlated to {target}  ({dt*1e6:.0f} µs)")
+    print("  " + "-" * 60)
+    for name, r in hits:
+        print(f"  {name:45s} {r:+8.4f}")
+
+if __name__ == "__main__":
+    main()
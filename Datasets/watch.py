@@ -0,0 +1,162 @@
+"""
+CORA – Watch mode
+==================
+Long-running alternative to re-running the three pipeline scripts by
+hand.  Pandas/scipy are imported once and the parsed processed frames
+stay resident (see compute_correlations.read_processed).  Datasets/raw/
+is polled for changed CSVs; for each change it
+
+  1. re-runs only the matching process_* loader (preprocess.LOADERS),
+  2. re-runs only the correlation stages that read that processed file
+     (compute_correlations.STAGE_INPUTS), and the EWMA and rolling-beta
+     engines on the daily / monthly frames they produce,
+  3. re-exports only the JSON files those stages feed; rolling pairs whose
+     inputs did not change are reused (forward-filled tail rows do not
+     count, so a new date on another series leaves them alone), the EWMA
+     and beta exports are skipped when their engines report no change,
+     and every JSON file is swapped into app/public/data/ atomically
+     (temp file + rename).
+
+merged_daily.csv, the rolling-beta CSVs and the zoom detail files
+(rolling/, ewma/, betas/) are written after the JSON swap so they stay
+off the file-drop → dashboard latency path; the beta results reach the
+export straight from memory.
+
+Run:  python Datasets/watch.py [--interval 0.2]
+"""
+
+import argparse, time, warnings
+
+import preprocess
+import compute_correlations as cc
+import ewma_correlations as ewma
+import rolling_beta
+import export_to_json as ex
+
+warnings.filterwarnings("ignore")
+
+# ── change detection ─────────────────────────────────────────────────────
+
+def snapshot():
+    """{file name: (mtime, size)} for every CSV in the raw directory."""
+    snap = {}
+    for fp in preprocess.RAW_DIR.glob("*.csv"):
+        try:
+            st = fp.stat()
+        except FileNotFoundError:  # removed between glob and stat
+            continue
+        snap[fp.name] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+def changed(prev, cur):
+    """Names that are new or whose (mtime, size) differ."""
+    return sorted(n for n, sig in cur.items() if prev.get(n) != sig)
+
+def settle(names, interval):
+    """Wait until the given files stop changing (copy still in progress)."""
+    while True:
+        before = {n: sig for n, sig in snapshot().items() if n in names}
+        time.sleep(interval / 4)
+        after = {n: sig for n, sig in snapshot().items() if n in names}
+        if before == after:
+            return after
+
+# ── refresh ──────────────────────────────────────────────────────────────
+
+def run_stages(stages, processed=None):
+    """
+    Correlation stages + dependent exports.  Returns (daily merged frame,
+    recomputed beta keys) for save_deferred.  Only the inline JSON is
+    written here; the finer pyramid levels wait for save_deferred.
+    Without *processed* (warm start) every export of the stages is written.
+    """
+    warm = processed is None
+    cc.within_dataset_correlations(processed)
+    merged_daily = cc.cross_dataset_daily(save_merged=False) if "daily" in stages else None
+    merged_monthly = cc.cross_dataset_monthly() if "monthly" in stages else None
+    if "annual" in stages:
+        cc.cross_dataset_annual()
+    ewma_changed = merged_daily is not None and ewma.update_all(merged_daily)  # one O(N²) step per new date
+    frames = {f: m for f, m in [("daily", merged_daily), ("monthly", merged_monthly)] if m is not None}
+    betas_changed = rolling_beta.compute_all(frames, save=False) if frames else []
+
+    print("\n── Export ─────────────────────────────────────────────────")
+    ex.export_within_dataset()
+    if stages & {"daily", "monthly"}:
+        ex.export_heatmap()
+    if "daily" in stages:
+        ex.export_rolling(merged_daily, defer=True)
+    if ewma_changed or (warm and "daily" in stages):
+        ex.export_ewma(defer=True)
+    if "monthly" in stages:
+        ex.export_dashboard()
+        ex.export_clusters()
+    if betas_changed or (warm and frames):
+        ex.export_betas(defer=True)
+    return merged_daily, betas_changed
+
+def save_deferred(merged_daily, betas_changed):
+    """Outputs kept off the file-drop → dashboard path, written after the JSON swap."""
+    if merged_daily is not None:
+        cc.save_merged_frame(merged_daily, "merged_daily.csv")
+    rolling_beta.save_results(betas_changed)
+    ex.flush_details()
+
+def refresh(raw_names):
+    """Re-process the changed raw files and everything downstream of them."""
+    t0 = time.perf_counter()
+    processed = set()
+    for name in raw_names:
+        if name not in preprocess.LOADERS:
+            print(f"  skip {name} (no loader)")
+            continue
+        loader, out = preprocess.LOADERS[name]
+        try:
+            loader()
+        except Exception as e:
+            print(f"  ✗ {name}: {type(e).__name__}: {e}")
+            continue
+        processed.add(out)
+    if not processed:
+        return
+
+    stages = {s for s, inputs in cc.STAGE_INPUTS.items() if processed & set(inputs)}
+    deferred = run_stages(stages, processed)
+    print(f"\n  Refreshed {', '.join(raw_names)} in {time.perf_counter() - t0:.3f} s "
+          f"(stages: {', '.join(sorted(stages)) or 'within-dataset only'})")
+    save_deferred(*deferred)
+
+# ── main ─────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Recompute CORA outputs when Datasets/raw/ changes")
+    ap.add_argument("--interval", type=float, default=0.2, help="poll interval in seconds")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("CORA – Watch mode")
+    print("=" * 80)
+    print(f"  Watching : {preprocess.RAW_DIR.resolve()}")
+    print(f"  Output   : {ex.OUT_DIR.resolve()}")
+
+    # Warm start: parse every processed file once and bring outputs up to date
+    t0 = time.perf_counter()
+    save_deferred(*run_stages(set(cc.STAGE_INPUTS)))
+    print(f"\n  Warm start done in {time.perf_counter() - t0:.1f} s – waiting for changes (Ctrl+C to stop)")
+
+    prev = snapshot()
+    try:
+        while True:
+            time.sleep(args.interval)
+            cur = snapshot()
+            names = changed(prev, cur)
+            if names:
+                cur.update(settle(names, args.interval))
+                print("\n" + "-" * 80)
+                refresh(names)
+            prev = cur
+    except KeyboardInterrupt:
+        print("\n  Stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ import {
   ReferenceLine, CartesianGrid,
 } from "recharts";
 
+// Zoom ranges (months back from the latest point; null = full history)
+const RANGES = { All: null, "10Y": 120, "5Y": 60, "1Y": 12, "6M": 6 };
+// A finer pyramid level is fetched when the zoomed view would show fewer points
+const MIN_POINTS = 400;
+
 function formatLabel(col) {
   return col
     .replace(/_/g, " ")
@@ -16,6 +21,8 @@ export default function RollingCorrelationPage() {
   const [data, setData] = useState(null);
   const [pairIdx, setPairIdx] = useState(0);
   const [window, setWindow] = useState("60D");
+  const [range, setRange] = useState("All");
+  const [details, setDetails] = useState({}); // detail file → finer levels per window
 
   useEffect(() => {
     fetch(`${process.env.PUBLIC_URL}/data/rolling_correlations.json`)
@@ -25,7 +32,42 @@ export default function RollingCorrelationPage() {
   }, []);
 
   const pair = data?.pairs?.[pairIdx];
-  const series = useMemo(() => (pair ? pair[window] || [] : []), [pair, window]);
+  const coarse = useMemo(() => (pair ? pair[window] || [] : []), [pair, window]);
+
+  // First date in view for the selected zoom range
+  const start = useMemo(() => {
+    if (!RANGES[range] || !coarse.length) return null;
+    const d = new Date(coarse[coarse.length - 1].date);
+    d.setMonth(d.getMonth() - RANGES[range]);
+    return d.toISOString().slice(0, 10);
+  }, [coarse, range]);
+
+  // Coarsest pyramid level that still gives MIN_POINTS inside the view
+  const level = useMemo(() => {
+    const levels = pair?.levels || [];
+    if (!start || !levels.length || !coarse.length) return levels[0] ?? null;
+    const share = coarse.filter((p) => p.date >= start).length / coarse.length;
+    return levels.find((n) => n * share >= MIN_POINTS) ?? levels[levels.length - 1];
+  }, [pair, coarse, start]);
+
+  // Finer levels live in the pair's detail file; fetch it on first zoom
+  useEffect(() => {
+    if (!pair?.detail || level === pair.levels[0] || details[pair.detail]) return;
+    fetch(`${process.env.PUBLIC_URL}/data/${pair.detail}`)
+      .then((r) => r.json())
+      .then((d) => setDetails((prev) => ({ ...prev, [pair.detail]: d.levels })))
+      .catch(console.error);
+  }, [pair, level, details]);
+
+  const series = useMemo(() => {
+    let points = coarse;
+    const finer = pair?.detail ? details[pair.detail]?.[window] : null;
+    if (finer && level !== pair.levels[0]) {
+      // Short series stop early; fall back to the finest level written
+      points = finer[String(level)] || Object.values(finer).pop() || coarse;
+    }
+    return start ? points.filter((p) => p.date >= start) : points;
+  }, [pair, window, coarse, details, level, start]);
 
   const currentCorr = pair?.current ?? 0;
   const strength =
@@ -102,6 +144,26 @@ export default function RollingCorrelationPage() {
                 ))}
               </div>
             </div>
+            <div className="w-full md:w-auto">
+              <label className="block text-xs font-bold text-slate-500 uppercase tracking-widest mb-2">
+                Range
+              </label>
+              <div className="flex bg-slate-100 p-1 rounded-lg">
+                {Object.keys(RANGES).map((r) => (
+                  <button
+                    key={r}
+                    onClick={() => setRange(r)}
+                    className={`px-3 py-1.5 text-xs font-semibold rounded transition-all ${
+                      range === r
+                        ? "bg-white shadow-sm text-primary"
+                        : "text-slate-600"
+                    }`}
+                  >
+                    {r}
+                  </button>
+                ))}
+              </div>
+            </div>
           </div>
 
           {/* Metric Card */}
@@ -146,7 +208,7 @@ export default function RollingCorrelationPage() {
               </div>
             </div>
             <span className="text-xs text-slate-400">
-              {series.length} data points (weekly)
+              {series.length} data points{range !== "All" ? ` (last ${range})` : ""}
             </span>
           </div>
           <div className="p-6">
@@ -227,7 +289,7 @@ export default function RollingCorrelationPage() {
                   </div>
                   <div className="flex justify-between items-center text-xs">
                     <span className="text-slate-500">Data Points ({window})</span>
-                    <span className="font-semibold">{series.length} weeks</span>
+                    <span className="font-semibold">{series.length} points</span>
                   </div>
                 </div>
               </div>